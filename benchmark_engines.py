@@ -0,0 +1,222 @@
+"""
+CITY-CAR Funnel-Analyse - Engine Benchmark
+==========================================
+Vergleicht die pandas- und die DuckDB-Engine des CityCarDataHandler auf
+synthetischen Daten in mehreren Größen. Das Laden wird getrennt gemessen,
+die Methoden danach auf warmem Zustand; zusätzlich gibt es den kalten
+Gesamtdurchlauf. Danach wird geprüft, dass beide Engines identische
+Ergebnisse liefern (Parity-Check).
+
+Aufruf: python benchmark_engines.py [anzahl_downloads ...]
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from funnel_utility import CityCarDataHandler
+
+# Konstanten
+DEFAULT_SCALES = [10_000, 100_000, 500_000]
+METHODS = [
+    'get_warmup_stats',
+    'calculate_funnel_steps',
+    'get_patience_metrics',
+    'get_platform_metrics',
+    'get_funnel_by_age',
+    'analyze_surge_demand'
+]
+PLATFORMS = ['ios', 'android', 'web']
+AGE_RANGES = ['18-24', '25-34', '35-44', '45-54', 'Unknown']
+
+
+def generate_data(folder, n_downloads, seed=42):
+    """Erzeugt synthetische CSV Dateien mit dem Schema der CityCar Daten."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2021-01-01')
+
+    def minutes(values):
+        return pd.to_timedelta(values, unit='m').round('s')
+
+    # Downloads
+    download_keys = np.array([f"d{i}" for i in range(n_downloads)])
+    pd.DataFrame({
+        'app_download_key': download_keys,
+        'platform': rng.choice(PLATFORMS, n_downloads, p=[0.6, 0.3, 0.1]),
+        'download_ts': start + minutes(rng.uniform(0, 525_600, n_downloads))
+    }).to_csv(os.path.join(folder, 'app_downloads.csv'), index=False)
+
+    # Signups (ca. 70 % der Downloads)
+    n_signups = int(n_downloads * 0.7)
+    user_ids = np.arange(n_signups)
+    age_ranges = rng.choice(AGE_RANGES, n_signups).astype(object)
+    age_ranges[rng.random(n_signups) < 0.05] = None
+    pd.DataFrame({
+        'session_id': rng.choice(download_keys, n_signups, replace=False),
+        'user_id': user_ids,
+        'signup_ts': start + minutes(rng.uniform(0, 525_600, n_signups)),
+        'age_range': age_ranges
+    }).to_csv(os.path.join(folder, 'signups.csv'), index=False)
+
+    # Ride Requests (Timestamps mit Lücken wie im Original)
+    n_requests = n_signups * 2
+    request_ts = start + minutes(rng.uniform(0, 525_600, n_requests))
+    accept_ts = pd.Series(request_ts + minutes(rng.exponential(6, n_requests)))
+    pickup_ts = pd.Series(accept_ts + minutes(rng.exponential(10, n_requests)))
+    dropoff_ts = pd.Series(pickup_ts + minutes(rng.uniform(5, 60, n_requests)))
+    cancel_ts = pd.Series(request_ts + minutes(rng.exponential(8, n_requests)))
+
+    accepted = rng.random(n_requests) < 0.6
+    cancelled = rng.random(n_requests) < 0.4
+    accept_ts[~accepted] = pd.NaT
+    pickup_ts[~accepted | cancelled] = pd.NaT
+    dropoff_ts[~accepted | cancelled] = pd.NaT
+    cancel_ts[~cancelled] = pd.NaT
+
+    ride_ids = np.arange(n_requests)
+    pd.DataFrame({
+        'ride_id': ride_ids,
+        'user_id': rng.choice(user_ids, n_requests),
+        'driver_id': rng.integers(0, 5_000, n_requests),
+        'request_ts': request_ts,
+        'accept_ts': accept_ts,
+        'pickup_location': 'A',
+        'destination_location': 'B',
+        'pickup_ts': pickup_ts,
+        'dropoff_ts': dropoff_ts,
+        'cancel_ts': cancel_ts
+    }).to_csv(os.path.join(folder, 'ride_requests.csv'), index=False)
+
+    # Transactions (eine pro abgeschlossener Fahrt)
+    completed = ride_ids[dropoff_ts.notna().values]
+    pd.DataFrame({
+        'ride_id': completed,
+        'purchase_amount_usd': rng.uniform(5, 80, len(completed)).round(2),
+        'charge_status': rng.choice(['Approved', 'Decline'], len(completed), p=[0.9, 0.1]),
+        'transaction_ts': dropoff_ts.dropna().values
+    }).to_csv(os.path.join(folder, 'transactions.csv'), index=False)
+
+    # Reviews (ca. 30 % der abgeschlossenen Fahrten)
+    reviewed = completed[rng.random(len(completed)) < 0.3]
+    pd.DataFrame({
+        'review_id': np.arange(len(reviewed)),
+        'ride_id': reviewed,
+        'driver_id': rng.integers(0, 5_000, len(reviewed)),
+        'user_id': rng.choice(user_ids, len(reviewed)),
+        'rating': rng.integers(1, 6, len(reviewed)),
+        'free_response': 'ok'
+    }).to_csv(os.path.join(folder, 'reviews.csv'), index=False)
+
+
+LOAD_STEP = 'Laden (pandas: laden+mergen / DuckDB: nur Views)'
+
+
+def check(condition, message):
+    """Wie assert, wird aber auch mit python -O nicht entfernt."""
+    if not condition:
+        raise AssertionError(message)
+
+
+def assert_same(expected, actual, name):
+    """Vergleicht die Ergebnisse beider Engines und bricht bei Abweichungen ab."""
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(expected, actual)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(expected, actual)
+    elif isinstance(expected, dict):
+        check(expected.keys() == actual.keys(), f"{name}: unterschiedliche Schlüssel")
+        for key in expected:
+            assert_same(expected[key], actual[key], f"{name}[{key}]")
+    elif isinstance(expected, list):
+        check(len(expected) == len(actual), f"{name}: unterschiedliche Länge")
+        for i, (exp, act) in enumerate(zip(expected, actual)):
+            assert_same(exp, act, f"{name}[{i}]")
+    elif isinstance(expected, (float, np.floating)):
+        check(
+            (math.isnan(expected) and math.isnan(actual))
+            or math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6),
+            f"{name}: {expected} != {actual}"
+        )
+    else:
+        check(expected == actual, f"{name}: {expected} != {actual}")
+
+
+def prepare(handler):
+    """Erledigt die einmaligen Vorarbeiten.
+
+    pandas liest die CSVs und führt den kompletten Merge aus. DuckDB legt nur
+    Views an, der Join läuft bei jeder Funnel-Abfrage erneut und steckt daher
+    in den Zeiten der einzelnen Methoden.
+    """
+    if handler.backend is not None:
+        handler.backend.load_data()
+    else:
+        handler.merge_all_data()
+
+
+def run_engine(folder, engine):
+    """Misst Laden, jede Methode auf warmem Zustand und den kalten Gesamtdurchlauf."""
+    timings = {}
+
+    # Kalt: neuer Handler, alle Methoden hintereinander inkl. Laden (bei DuckDB inkl. Parquet-Cache)
+    t0 = time.perf_counter()
+    cold_handler = CityCarDataHandler(data_folder=folder, engine=engine)
+    for method in METHODS:
+        getattr(cold_handler, method)()
+    timings['GESAMT (kalt)'] = time.perf_counter() - t0
+
+    # Warm: Laden separat messen (Cache existiert bereits), danach jede Methode einzeln
+    handler = CityCarDataHandler(data_folder=folder, engine=engine)
+    t0 = time.perf_counter()
+    prepare(handler)
+    timings[LOAD_STEP] = time.perf_counter() - t0
+
+    results = {}
+    for method in METHODS:
+        t0 = time.perf_counter()
+        results[method] = getattr(handler, method)()
+        timings[method] = time.perf_counter() - t0
+
+    return results, timings
+
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SCALES
+
+    rows = []
+    for n_downloads in scales:
+        with tempfile.TemporaryDirectory() as folder:
+            print(f"\nErzeuge synthetische Daten mit {n_downloads} Downloads...")
+            generate_data(folder, n_downloads)
+
+            results_pd, timings_pd = run_engine(folder, 'pandas')
+            results_db, timings_db = run_engine(folder, 'duckdb')
+
+        for method in METHODS:
+            assert_same(results_pd[method], results_db[method], method)
+        print("Parity-Check bestanden: pandas und DuckDB liefern identische Ergebnisse.")
+
+        for step in [LOAD_STEP] + METHODS + ['GESAMT (kalt)']:
+            rows.append({
+                'Downloads': n_downloads,
+                'Schritt': step,
+                'pandas_s': timings_pd[step],
+                'duckdb_s': timings_db[step]
+            })
+
+    df_bench = pd.DataFrame(rows)
+    df_bench['Speedup'] = df_bench['pandas_s'] / df_bench['duckdb_s']
+
+    print("\n" + "=" * 70)
+    print("      BENCHMARK: PANDAS vs. DUCKDB      ")
+    print("=" * 70)
+    print(df_bench.to_string(index=False, float_format=lambda x: '%.3f' % x))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Repo-Root in den Importpfad, damit `pytest` die Module (funnel_utility, ...) findet.
@@ -0,0 +1,237 @@
+import pandas as pd
+import json
+import os
+
+
+class DuckDBBackend:
+    """Führt die Funnel-Abfragen mit DuckDB direkt auf den CSV Dateien aus."""
+
+    TABLES = {
+        'downloads': 'app_downloads.csv',
+        'signups': 'signups.csv',
+        'requests': 'ride_requests.csv',
+        'transactions': 'transactions.csv',
+        'reviews': 'reviews.csv'
+    }
+
+    TIMESTAMP_COLUMNS = ['request_ts', 'accept_ts', 'pickup_ts', 'dropoff_ts', 'cancel_ts']
+
+    # Standard NA-Werte von pd.read_csv, damit beide Engines dieselben NULLs sehen
+    NA_VALUES = [
+        '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+        '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+    ]
+
+    def __init__(self, data_folder='data'):
+        self.data_folder = data_folder
+        self.con = None
+
+    def load_data(self):
+        """Legt Views auf einen Parquet-Cache neben den CSV Dateien an (Daten bleiben auf der Platte)."""
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("Für engine='duckdb' muss das Paket 'duckdb' installiert sein (pip install duckdb).")
+
+        print("Verbinde DuckDB mit den Daten...")
+        self.con = duckdb.connect()
+
+        for table, file_name in self.TABLES.items():
+            csv_path = os.path.join(self.data_folder, file_name)
+            parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+            meta_path = parquet_path + '.meta'
+            csv_source = self._read_csv_sql(table, csv_path)
+
+            # Cache neu schreiben, wenn Größe oder Änderungszeit der CSV nicht mehr zum Cache passen
+            csv_stat = {'size': os.path.getsize(csv_path), 'mtime_ns': os.stat(csv_path).st_mtime_ns}
+            if not os.path.exists(parquet_path) or self._read_meta(meta_path) != csv_stat:
+                try:
+                    self.con.execute(f"COPY (SELECT * FROM {csv_source}) TO '{self._quote(parquet_path)}' (FORMAT PARQUET)")
+                    with open(meta_path, 'w') as f:
+                        json.dump(csv_stat, f)
+                except (duckdb.Error, OSError) as e:
+                    print(f"Parquet-Cache für {file_name} nicht möglich, lese CSV direkt: {e}")
+                    self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM {csv_source}")
+                    continue
+
+            self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{self._quote(parquet_path)}')")
+
+        # Entspricht CityCarDataHandler.merge_all_data (nur die benötigten Spalten)
+        self.con.execute("""
+            CREATE VIEW funnel AS
+            SELECT
+                d.app_download_key,
+                d.platform,
+                s.user_id,
+                s.age_range,
+                r.request_ts,
+                r.accept_ts,
+                r.dropoff_ts,
+                t.charge_status,
+                v.review_id
+            FROM downloads d
+            LEFT JOIN signups s ON d.app_download_key = s.session_id
+            LEFT JOIN requests r ON s.user_id = r.user_id
+            LEFT JOIN transactions t ON r.ride_id = t.ride_id
+            LEFT JOIN reviews v ON r.ride_id = v.ride_id
+        """)
+
+        print("DuckDB Views erfolgreich angelegt.")
+
+    @staticmethod
+    def _quote(path):
+        return path.replace("'", "''")
+
+    @staticmethod
+    def _read_meta(meta_path):
+        """Liest Größe und Änderungszeit der CSV, aus der der Parquet-Cache gebaut wurde."""
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_csv_sql(self, table, csv_path):
+        """Baut den read_csv Aufruf mit pandas-kompatiblen NA-Werten und Zeitspalten."""
+        nullstr = ', '.join(f"'{value}'" for value in self.NA_VALUES)
+        types = ''
+        if table == 'requests':
+            types = ', types = {' + ', '.join(f"'{col}': 'TIMESTAMP'" for col in self.TIMESTAMP_COLUMNS) + '}'
+        # sample_size = -1: Spaltentypen anhand der ganzen Datei bestimmen, nicht nur einer Stichprobe
+        return (
+            f"read_csv('{self._quote(csv_path)}', header = true, sample_size = -1, "
+            f"nullstr = [{nullstr}]{types})"
+        )
+
+    def _query(self, sql):
+        if self.con is None:
+            self.load_data()
+        return self.con.execute(sql)
+
+    def get_warmup_stats(self):
+        """Beantwortet die Warm-up Fragen aus der Aufgabe."""
+        (rides_requested, rides_completed, unique_users, avg_duration,
+         rides_accepted) = self._query("""
+            SELECT
+                count(*),
+                count(dropoff_ts),
+                count(DISTINCT user_id),
+                avg((epoch_ms(dropoff_ts) - epoch_ms(pickup_ts)) / 60000.0),
+                count(accept_ts)
+            FROM requests
+        """).fetchone()
+
+        platform_counts = self._query("""
+            SELECT platform, count(*) AS n
+            FROM downloads
+            WHERE platform IS NOT NULL
+            GROUP BY platform
+            ORDER BY n DESC
+        """).fetchall()
+
+        return {
+            '1_downloads': self._query("SELECT count(*) FROM downloads").fetchone()[0],
+            '2_signups': self._query("SELECT count(*) FROM signups").fetchone()[0],
+            '3_rides_requested': rides_requested,
+            '4_rides_completed': rides_completed,
+            '5_unique_users_requesting': unique_users,
+            '6_avg_duration_minutes': round(avg_duration, 2) if avg_duration is not None else float('nan'),
+            '7_rides_accepted': rides_accepted,
+            '8_total_revenue': self._query(
+                "SELECT coalesce(sum(purchase_amount_usd), 0) FROM transactions"
+            ).fetchone()[0],
+            '9_platform_counts': dict(platform_counts)
+        }
+
+    def calculate_funnel_steps(self):
+        """Berechnet die Anzahl der Unique Users für jede Funnel-Stufe."""
+        counts = self._query("""
+            SELECT
+                count(DISTINCT app_download_key),
+                count(DISTINCT user_id),
+                count(DISTINCT user_id) FILTER (WHERE request_ts IS NOT NULL),
+                count(DISTINCT user_id) FILTER (WHERE accept_ts IS NOT NULL),
+                count(DISTINCT user_id) FILTER (WHERE dropoff_ts IS NOT NULL),
+                count(DISTINCT user_id) FILTER (WHERE charge_status = 'Approved'),
+                count(DISTINCT user_id) FILTER (WHERE review_id IS NOT NULL)
+            FROM funnel
+        """).fetchone()
+
+        return {
+            'steps': ['Downloads', 'Signups', 'Requests', 'Accepted', 'Completed', 'Payment', 'Reviews'],
+            'counts': list(counts)
+        }
+
+    def get_patience_metrics(self):
+        """Vergleicht Median-Wartezeiten (Realität) mit der Geduld bis zum Abbruch."""
+        search_reality, search_patience, pickup_reality, pickup_patience = self._query("""
+            SELECT
+                quantile_cont((epoch_ms(accept_ts) - epoch_ms(request_ts)) / 60000.0, 0.5)
+                    FILTER (WHERE accept_ts IS NOT NULL),
+                quantile_cont((epoch_ms(cancel_ts) - epoch_ms(request_ts)) / 60000.0, 0.5)
+                    FILTER (WHERE cancel_ts IS NOT NULL AND accept_ts IS NULL),
+                quantile_cont((epoch_ms(pickup_ts) - epoch_ms(accept_ts)) / 60000.0, 0.5)
+                    FILTER (WHERE pickup_ts IS NOT NULL),
+                quantile_cont((epoch_ms(cancel_ts) - epoch_ms(accept_ts)) / 60000.0, 0.5)
+                    FILTER (WHERE cancel_ts IS NOT NULL AND accept_ts IS NOT NULL)
+            FROM requests
+        """).fetchone()
+
+        minutes = [search_reality, search_patience, pickup_reality, pickup_patience]
+
+        return {
+            'Phasen': ['1. Fahrersuche', '1. Fahrersuche', '2. Abholung', '2. Abholung'],
+            'Typ': ['Realität (Wartezeit)', 'Geduld (Limit)', 'Realität (Anfahrt)', 'Geduld (Limit)'],
+            'Minuten': [value if value is not None else float('nan') for value in minutes],
+            'Farbe': ['#3498db', '#95a5a6', '#e74c3c', '#95a5a6']  # Blau, Grau, Rot (Problem), Grau
+        }
+
+    def get_platform_metrics(self):
+        """Analysiert den Funnel getrennt nach Plattform (ios, android, web)."""
+        platform_stats = self._query("""
+            SELECT
+                platform AS Platform,
+                count(DISTINCT app_download_key) AS Downloads,
+                count(dropoff_ts) AS Completed_Rides
+            FROM funnel
+            WHERE platform IS NOT NULL
+            GROUP BY platform
+            ORDER BY platform
+        """).df()
+
+        platform_stats['Conversion_Rate'] = (
+            platform_stats['Completed_Rides'] / platform_stats['Downloads']
+        ) * 100
+
+        return platform_stats
+
+    def get_funnel_by_age(self):
+        """Berechnet den Funnel getrennt nach Altersgruppen."""
+        return self._query("""
+            SELECT
+                age_range AS Age_Group,
+                count(DISTINCT user_id) AS "1_Signups",
+                count(DISTINCT user_id) FILTER (WHERE request_ts IS NOT NULL) AS "2_Requests",
+                count(DISTINCT user_id) FILTER (WHERE dropoff_ts IS NOT NULL) AS "3_Completed",
+                count(DISTINCT user_id) FILTER (WHERE review_id IS NOT NULL) AS "4_Reviews"
+            FROM funnel
+            WHERE age_range IS NOT NULL
+            GROUP BY age_range
+            ORDER BY age_range
+        """).df()
+
+    def analyze_surge_demand(self):
+        """Analysiert die Nachfrage nach Tageszeit für Surge Pricing."""
+        df_hours = self._query("""
+            SELECT hour(request_ts) AS hour, count(*) AS count
+            FROM requests
+            WHERE request_ts IS NOT NULL
+            GROUP BY hour
+            ORDER BY hour
+        """).df()
+
+        return pd.Series(
+            df_hours['count'].values,
+            index=pd.Index(df_hours['hour'].astype('int32').values, name='hour'),
+            name='count'
+        )
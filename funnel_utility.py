@@ -1,12 +1,21 @@
 import pandas as pd
 import os
 
+from duckdb_backend import DuckDBBackend
+
 
 class CityCarDataHandler:
     """Klasse zum Laden und Vorbereiten der CityCar Daten."""
 
-    def __init__(self, data_folder='data'):
+    ENGINES = ('pandas', 'duckdb')
+
+    def __init__(self, data_folder='data', engine='pandas'):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unbekannte Engine '{engine}'. Erlaubt: {', '.join(self.ENGINES)}")
+
         self.data_folder = data_folder
+        self.engine = engine
+        self.backend = DuckDBBackend(data_folder) if engine == 'duckdb' else None
         self.df_downloads = None
         self.df_signups = None
         self.df_requests = None
@@ -106,6 +115,9 @@ class CityCarDataHandler:
 
     def get_warmup_stats(self):
         """Beantwortet die Warm-up Fragen aus der Aufgabe."""
+        if self.backend is not None:
+            return self.backend.get_warmup_stats()
+
         if self.df_requests is None:
             self.load_data()
 
@@ -127,6 +139,9 @@ class CityCarDataHandler:
 
     def calculate_funnel_steps(self):
         """Berechnet die Anzahl der Unique Users für jede Funnel-Stufe."""
+        if self.backend is not None:
+            return self.backend.calculate_funnel_steps()
+
         if self.df_funnel is None:
             self.merge_all_data()
 
@@ -145,7 +160,9 @@ class CityCarDataHandler:
         }
 
     def get_patience_metrics(self):
-
+        """Vergleicht Median-Wartezeiten (Realität) mit der Geduld bis zum Abbruch."""
+        if self.backend is not None:
+            return self.backend.get_patience_metrics()
 
         if self.df_requests is None: self.load_data()
 
@@ -185,6 +202,9 @@ class CityCarDataHandler:
 } 
     def get_platform_metrics(self):
         """Analysiert den Funnel getrennt nach Plattform (ios, android, web)."""
+        if self.backend is not None:
+            return self.backend.get_platform_metrics()
+
         if self.df_funnel is None:
             self.merge_all_data()
 
@@ -202,6 +222,9 @@ class CityCarDataHandler:
 
     def get_funnel_by_age(self):
         """Berechnet den Funnel getrennt nach Altersgruppen."""
+        if self.backend is not None:
+            return self.backend.get_funnel_by_age()
+
         if self.df_funnel is None:
             self.merge_all_data()
 
@@ -220,10 +243,13 @@ class CityCarDataHandler:
             })
 
         df_results = pd.DataFrame(results)
-        return df_results.sort_values('Age_Group')
+        return df_results.sort_values('Age_Group').reset_index(drop=True)
 
     def analyze_surge_demand(self):
         """Analysiert die Nachfrage nach Tageszeit für Surge Pricing."""
+        if self.backend is not None:
+            return self.backend.analyze_surge_demand()
+
         if self.df_requests is None:
             self.load_data()
 
@@ -0,0 +1,182 @@
+"""Parity-Tests: die DuckDB-Engine muss dieselben Ergebnisse liefern wie der pandas-Pfad."""
+
+import math
+import os
+
+import pandas as pd
+import pytest
+
+from funnel_utility import CityCarDataHandler
+
+pytest.importorskip("duckdb")
+
+
+DOWNLOADS = """app_download_key,platform,download_ts
+d1,ios,2021-01-01 08:00:00
+d2,android,2021-01-01 09:00:00
+d3,web,2021-01-02 10:00:00
+d4,NA,2021-01-02 11:00:00
+d5,ios,2021-01-03 12:00:00
+d6,,2021-01-03 13:00:00
+"""
+
+# d5 und d6 ohne Signup, User 3 ohne Altersgruppe ('NA'), User 5 mit leerer Altersgruppe
+SIGNUPS = """session_id,user_id,signup_ts,age_range
+d1,1,2021-01-01 08:05:00,18-24
+d2,2,2021-01-01 09:05:00,25-34
+d3,3,2021-01-02 10:05:00,NA
+d4,4,2021-01-02 11:05:00,18-24
+d6,5,2021-01-03 13:05:00,
+"""
+
+# Fahrt 1: abgeschlossen, Fahrt 2: Abbruch ohne Zusage, Fahrt 3: Abbruch nach Zusage,
+# Fahrt 4: abgeschlossen, Fahrt 5: nur angefragt ('NA' statt leerer Felder)
+RIDE_REQUESTS = """ride_id,user_id,driver_id,request_ts,accept_ts,pickup_location,destination_location,pickup_ts,dropoff_ts,cancel_ts
+1,1,101,2021-01-05 08:00:00,2021-01-05 08:03:00,A,B,2021-01-05 08:15:00,2021-01-05 08:45:00,
+2,1,,2021-01-06 17:00:00,,A,B,,,2021-01-06 17:07:30
+3,2,102,2021-01-06 17:30:00,2021-01-06 17:32:00,A,B,,,2021-01-06 17:41:00
+4,4,103,2021-01-07 23:10:00,2021-01-07 23:16:00,A,B,2021-01-07 23:25:00,2021-01-07 23:55:30,
+5,3,NA,2021-01-08 08:20:00,NA,A,B,NA,NA,NA
+"""
+
+TRANSACTIONS = """ride_id,purchase_amount_usd,charge_status,transaction_ts
+1,12.5,Approved,2021-01-05 08:46:00
+4,20.25,Decline,2021-01-07 23:56:00
+"""
+
+REVIEWS = """review_id,ride_id,driver_id,user_id,rating,free_response
+1,1,101,1,5,Super
+"""
+
+
+def write_data(folder, ride_requests=RIDE_REQUESTS):
+    """Schreibt die Test-CSVs im Format der CityCar Daten."""
+    files = {
+        'app_downloads.csv': DOWNLOADS,
+        'signups.csv': SIGNUPS,
+        'ride_requests.csv': ride_requests,
+        'transactions.csv': TRANSACTIONS,
+        'reviews.csv': REVIEWS
+    }
+    for file_name, content in files.items():
+        with open(os.path.join(folder, file_name), 'w') as f:
+            f.write(content)
+    return str(folder)
+
+
+def run_both(folder, method):
+    """Führt eine Methode mit beiden Engines aus."""
+    expected = getattr(CityCarDataHandler(data_folder=folder, engine='pandas'), method)()
+    actual = getattr(CityCarDataHandler(data_folder=folder, engine='duckdb'), method)()
+    return expected, actual
+
+
+@pytest.fixture
+def data_folder(tmp_path):
+    return write_data(tmp_path)
+
+
+def test_get_warmup_stats(data_folder):
+    expected, actual = run_both(data_folder, 'get_warmup_stats')
+
+    assert expected.keys() == actual.keys()
+    for key in expected:
+        if isinstance(expected[key], float):
+            assert math.isclose(expected[key], actual[key]), key
+        else:
+            assert expected[key] == actual[key], key
+    assert 'NA' not in actual['9_platform_counts']
+
+
+def test_calculate_funnel_steps(data_folder):
+    expected, actual = run_both(data_folder, 'calculate_funnel_steps')
+
+    assert expected == actual
+
+
+@pytest.mark.parametrize('with_cancellations', [True, False])
+def test_get_patience_metrics(tmp_path, with_cancellations):
+    ride_requests = RIDE_REQUESTS
+    if not with_cancellations:
+        # Ohne Abbrüche sind beide Geduld-Gruppen leer (Median = NaN)
+        lines = ride_requests.splitlines()
+        ride_requests = '\n'.join([lines[0]] + [line.rsplit(',', 1)[0] + ',' for line in lines[1:]]) + '\n'
+    folder = write_data(tmp_path, ride_requests)
+
+    expected, actual = run_both(folder, 'get_patience_metrics')
+
+    assert expected.keys() == actual.keys()
+    for key in ['Phasen', 'Typ', 'Farbe']:
+        assert expected[key] == actual[key]
+    pd.testing.assert_series_equal(pd.Series(expected['Minuten']), pd.Series(actual['Minuten']))
+    if not with_cancellations:
+        assert math.isnan(actual['Minuten'][1]) and math.isnan(actual['Minuten'][3])
+
+
+def test_get_platform_metrics(data_folder):
+    expected, actual = run_both(data_folder, 'get_platform_metrics')
+
+    pd.testing.assert_frame_equal(expected, actual)
+    assert 'NA' not in actual['Platform'].tolist()
+
+
+def test_get_funnel_by_age(data_folder):
+    expected, actual = run_both(data_folder, 'get_funnel_by_age')
+
+    pd.testing.assert_frame_equal(expected, actual)
+    assert actual['Age_Group'].tolist() == ['18-24', '25-34']
+
+
+def test_analyze_surge_demand(data_folder):
+    expected, actual = run_both(data_folder, 'analyze_surge_demand')
+
+    pd.testing.assert_series_equal(expected, actual)
+
+
+def test_parquet_cache_is_refreshed(data_folder):
+    handler = CityCarDataHandler(data_folder=data_folder, engine='duckdb')
+    assert handler.get_warmup_stats()['1_downloads'] == 6
+    assert os.path.exists(os.path.join(data_folder, 'app_downloads.parquet'))
+
+    # Neuere CSV muss den Cache ungültig machen
+    csv_path = os.path.join(data_folder, 'app_downloads.csv')
+    with open(csv_path, 'a') as f:
+        f.write('d7,web,2021-01-04 08:00:00\n')
+    mtime = os.path.getmtime(os.path.join(data_folder, 'app_downloads.parquet')) + 10
+    os.utime(csv_path, (mtime, mtime))
+
+    handler = CityCarDataHandler(data_folder=data_folder, engine='duckdb')
+    assert handler.get_warmup_stats()['1_downloads'] == 7
+
+
+def test_parquet_cache_detects_replaced_csv_with_older_mtime(data_folder):
+    handler = CityCarDataHandler(data_folder=data_folder, engine='duckdb')
+    assert handler.get_warmup_stats()['1_downloads'] == 6
+
+    # Ersetzte CSV mit älterer Änderungszeit (z.B. shutil.copy2, cp -p, unzip)
+    csv_path = os.path.join(data_folder, 'app_downloads.csv')
+    with open(csv_path, 'w') as f:
+        f.write(DOWNLOADS + 'd7,web,2021-01-04 08:00:00\nd8,ios,2021-01-04 09:00:00\n')
+    mtime = os.path.getmtime(os.path.join(data_folder, 'app_downloads.parquet')) - 3600
+    os.utime(csv_path, (mtime, mtime))
+
+    expected, actual = run_both(data_folder, 'get_warmup_stats')
+    assert expected['1_downloads'] == actual['1_downloads'] == 8
+
+
+def test_column_type_changes_after_sample(tmp_path):
+    # Mehr Zeilen als DuckDBs Standard-Stichprobe, letzte driver_id ist kein Integer
+    header, first_ride = RIDE_REQUESTS.splitlines()[:2]
+    fields = first_ride.split(',')
+    lines = [header]
+    for ride_id in range(1, 42_001):
+        fields[0] = str(ride_id)
+        fields[2] = 'x17' if ride_id == 42_000 else str(100 + ride_id % 50)
+        lines.append(','.join(fields))
+    folder = write_data(tmp_path, '\n'.join(lines) + '\n')
+
+    expected, actual = run_both(folder, 'get_warmup_stats')
+
+    assert actual['3_rides_requested'] == 42_000
+    for key in expected:
+        assert expected[key] == actual[key], key